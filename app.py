@@ -1,10 +1,23 @@
 # app.py
 
+import os
+
+# Prediksi hanya satu baris per klik, sehingga thread pool OpenMP justru menambah latensi.
+# Harus di-set sebelum runtime OpenMP (xgboost/onnxruntime/treelite) dimuat agar berlaku.
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
 import streamlit as st
-import pandas as pd
 import numpy as np
-import pickle
 import datetime
+import requests
+
+from features import (brands, models_dict, fuel_types, transmissions, doors_options,
+                      encode_inputs, make_row_builder)
+from predictor import MODEL_PATH, ONNX_PATH, TREELITE_PATH, load_pipeline, load_predictor
+
+# Jika di-set (misal http://localhost:8000), prediksi dikirim ke layanan predict_svc.py
+# alih-alih dijalankan di proses Streamlit.
+PREDICT_SVC_URL = os.environ.get('PREDICT_SVC_URL')
 
 # --- Konfigurasi Halaman ---
 st.set_page_config(
@@ -14,15 +27,53 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_data(ttl=86400)
+def _current_year():
+    """Tahun berjalan, dihitung ulang paling lambat sekali sehari alih-alih pada setiap rerun."""
+    return datetime.datetime.now().year
+
+CURRENT_YEAR = _current_year()
+
+def _remote_predictor(url):
+    """Mengirim vektor input ke layanan predict_svc.py; koneksi HTTP dipakai ulang antar klik."""
+    session = requests.Session()
+    endpoint = f"{url.rstrip('/')}/predict"
+
+    def predict(x):
+        response = session.post(endpoint, json={'features': x[0].tolist()}, timeout=5)
+        response.raise_for_status()
+        return float(response.json()['prediction'])
+
+    return predict
+
 # --- Memuat Model yang Sudah Ada ---
-# Model ini diasumsikan sudah dilatih dengan data yang sudah di-preprocess (One-Hot Encoded)
+# Model berupa Pipeline scikit-learn (ColumnTransformer + XGBoost). Preprocessing-nya dibaca
+# sekali saat model dimuat lalu dijalankan langsung dengan NumPy pada setiap klik.
 @st.cache_resource
-def load_model(path):
-    """Memuat model pickle dari path yang diberikan, dengan caching."""
+def load_model(path, treelite_path=TREELITE_PATH, onnx_path=ONNX_PATH):
+    """Memuat model dari path yang diberikan, dengan caching.
+
+    Mengembalikan (transform_row, predict, n_features): transform_row menyusun vektor input
+    model dari nilai mentah, predict menghasilkan harga dari vektor tersebut, dan n_features
+    adalah lebar vektor input.
+    """
     try:
-        with open(path, 'rb') as f:
-            model = pickle.load(f)
-        return model
+        _, regressor, transform_row = make_row_builder(load_pipeline(path))
+        warmup_row = transform_row((2018, 2.0, 50000, 4, 1, 1, 50000), (0, 0, 0, 0, 0))
+        if PREDICT_SVC_URL:
+            predict = _remote_predictor(PREDICT_SVC_URL)
+        else:
+            # Baris pemanasan juga dipakai untuk memastikan artefak Treelite/ONNX cocok dengan model
+            predict = load_predictor(regressor, treelite_path, onnx_path, check_x=warmup_row)
+
+        # Beberapa prediksi pertama lebih lambat (inisialisasi thread, memori, atau JIT);
+        # jalankan di sini agar tidak dibayar oleh klik pertama pengguna. Layanan prediksi
+        # tidak dipanaskan: saat Streamlit baru start layanan itu mungkin belum siap, dan
+        # kegagalannya tidak boleh ikut tersimpan di cache_resource.
+        if not PREDICT_SVC_URL:
+            for _ in range(5):
+                predict(warmup_row)
+        return transform_row, predict, warmup_row.shape[1]
     except FileNotFoundError:
         st.error(f"Error: File model '{path}' tidak ditemukan. Pastikan file berada di direktori yang sama.")
         return None
@@ -30,123 +81,87 @@ def load_model(path):
         st.error(f"Error saat memuat model: {e}")
         return None
 
-model = load_model('car_price_xgboost_model.pkl')
-if model is None:
+loaded = load_model(MODEL_PATH)
+if loaded is None:
     st.stop()  # Hentikan eksekusi jika model gagal dimuat
+transform_row, predict_price, N_FEATURES = loaded
 
-# --- Data untuk Dropdown UI ---
-# PENTING: Daftar ini harus sama persis dengan kategori yang digunakan saat melatih model
-brands = ['Audi', 'BMW', 'Chevrolet', 'Ford', 'Honda', 'Hyundai', 'Kia', 
-          'Mercedes', 'Toyota', 'Volkswagen']
-models_dict = {
-    'Audi': ['A3', 'A4', 'Q5'], 'BMW': ['3 Series', '5 Series', 'X5'], 'Chevrolet': ['Equinox', 'Impala', 'Malibu'],
-    'Ford': ['Explorer', 'Fiesta', 'Focus'], 'Honda': ['Accord', 'CR-V', 'Civic'], 'Hyundai': ['Elantra', 'Sonata', 'Tucson'],
-    'Kia': ['Optima', 'Rio', 'Sportage'], 'Mercedes': ['C-Class', 'E-Class', 'GLA'], 'Toyota': ['Camry', 'Corolla', 'RAV4'],
-    'Volkswagen': ['Golf', 'Passat', 'Tiguan']
-}
-fuel_types = ['Petrol', 'Diesel', 'Hybrid', 'Electric']
-transmissions = ['Automatic', 'Manual', 'Semi-Automatic']
-doors_options = [2, 3, 4, 5]
-CURRENT_YEAR = datetime.datetime.now().year
+@st.cache_data(max_entries=10000, show_spinner=False)
+def _predict_cached(numerics, codes, _out=None):
+    """Prediksi dari tuple input mentah; hasilnya dibagi antar sesi sehingga input yang sama
+    tidak dihitung ulang. Buffer _out tidak ikut di-hash (awalan garis bawah)."""
+    return predict_price(transform_row(numerics, codes, out=_out))
 
 # --- UI Header ---
 st.title('🚗 Prediksi Harga Mobil')
 st.markdown("""
 **Prediksikan harga mobil bekas Anda dengan akurat menggunakan model machine learning XGBoost.**
-Masukkan detail mobil di sidebar untuk mendapatkan estimasi harga.
+Masukkan detail mobil di sidebar lalu tekan **Prediksi Harga** untuk mendapatkan estimasi harga.
 """)
 
 # --- Sidebar untuk Input Pengguna ---
+# Input dikelompokkan dalam st.form sehingga mengubah slider/dropdown tidak memicu rerun
+# seluruh skrip; rerun hanya terjadi saat tombol prediksi ditekan. Merek sengaja berada di
+# luar form karena daftar pilihan Model harus langsung diperbarui ketika merek diganti.
 with st.sidebar:
     st.header('📋 Detail Mobil')
     st.subheader('Informasi Umum')
     
     brand = st.selectbox('Merek', brands, key='brand')
-    model_name = st.selectbox('Model', models_dict[brand], key='model_name')
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        year = st.slider('Tahun Pembuatan', 2000, CURRENT_YEAR, 2018)
-    with col2:
-        engine_size = st.slider('Ukuran Mesin (L)', 1.0, 5.0, 2.0, 0.1)
-    
-    col3, col4 = st.columns(2)
-    with col3:
-        fuel_type = st.selectbox('Jenis Bahan Bakar', fuel_types)
-    with col4:
-        transmission = st.selectbox('Transmisi', transmissions)
-    
-    mileage = st.number_input('Jarak Tempuh (km)', min_value=0, max_value=300000, value=50000, step=1000)
-    
-    col5, col6 = st.columns(2)
-    with col5:
-        doors = st.selectbox('Jumlah Pintu', doors_options, index=2)
-    with col6:
-        owner_count = st.slider('Jumlah Pemilik Sebelumnya', 1, 5, 1)
 
-# --- Logika Prediksi ---
-if st.button('🚀 Prediksi Harga', use_container_width=True, type="primary"):
-    # 1. Hitung fitur tambahan dari input pengguna
-    car_age = CURRENT_YEAR - year
-    mileage_per_year = mileage / car_age if car_age > 0 else 0
-    brand_model = f"{brand}_{model_name}"
-
-    # 2. Buat DataFrame dari input pengguna (1 baris)
-    input_data = pd.DataFrame({
-        'Brand': [brand],
-        'Model': [model_name],
-        'Year': [year],
-        'Engine_Size': [engine_size],
-        'Fuel_Type': [fuel_type],
-        'Transmission': [transmission],
-        'Mileage': [mileage],
-        'Doors': [doors],
-        'Owner_Count': [owner_count],
-        'Car_Age': [car_age],
-        'Mileage_per_Year': [mileage_per_year],
-        'Brand_Model': [brand_model]
-    })
-
-    # --- BAGIAN KRITIS: Pra-pemrosesan Input ---
-    # Model Anda mengharapkan kolom numerik (bukan teks). Kita harus mengubah input
-    # pengguna agar cocok dengan format data saat training.
-
-    st.info("Memproses input agar sesuai dengan format model...", icon="⚙️")
-    
-    # Definisikan fitur kategorikal dan numerik (harus sama dengan saat training)
-    categorical_features = ['Brand', 'Model', 'Fuel_Type', 'Transmission', 'Brand_Model']
-    numerical_features = ['Year', 'Engine_Size', 'Mileage', 'Doors', 'Owner_Count', 'Car_Age', 'Mileage_per_Year']
+    with st.form('car_inputs'):
+        model_name = st.selectbox('Model', models_dict[brand], key='model_name')
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            year = st.slider('Tahun Pembuatan', 2000, CURRENT_YEAR, 2018)
+        with col2:
+            engine_size = st.slider('Ukuran Mesin (L)', 1.0, 5.0, 2.0, 0.1)
+        
+        col3, col4 = st.columns(2)
+        with col3:
+            fuel_type = st.selectbox('Jenis Bahan Bakar', fuel_types)
+        with col4:
+            transmission = st.selectbox('Transmisi', transmissions)
+        
+        mileage = st.number_input('Jarak Tempuh (km)', min_value=0, max_value=300000, value=50000, step=1000)
+        
+        col5, col6 = st.columns(2)
+        with col5:
+            doors = st.selectbox('Jumlah Pintu', doors_options, index=2)
+        with col6:
+            owner_count = st.slider('Jumlah Pemilik Sebelumnya', 1, 5, 1)
+
+        submitted = st.form_submit_button('🚀 Prediksi Harga', use_container_width=True, type="primary")
 
-    # Lakukan One-Hot Encoding pada input pengguna
-    input_encoded = pd.get_dummies(input_data, columns=categorical_features)
-    
-    # Buat daftar SEMUA kemungkinan kolom setelah encoding, berdasarkan opsi di UI
-    # Ini untuk memastikan input memiliki semua kolom yang diharapkan model.
-    all_models = [f"{b}_{m}" for b in brands for m in models_dict[b]]
-    
-    expected_cols = numerical_features + \
-                    [f'Brand_{b}' for b in brands] + \
-                    [f'Model_{m}' for b in brands for m in models_dict[b]] + \
-                    [f'Fuel_Type_{f}' for f in fuel_types] + \
-                    [f'Transmission_{t}' for t in transmissions] + \
-                    [f'Brand_Model_{bm}' for bm in all_models]
-    
-    # Hapus duplikat kolom jika ada
-    expected_cols = sorted(list(set(expected_cols)))
-
-    # Reindex input yang sudah di-encode agar memiliki kolom yang sama persis dengan model
-    # Kolom yang tidak ada di input pengguna akan diisi dengan 0.
-    final_input = input_encoded.reindex(columns=expected_cols, fill_value=0)
-    
-    # Pastikan urutan kolom sama seperti saat training (opsional tapi praktik terbaik)
-    # Jika Anda tidak tahu urutan pastinya, reindex di atas sudah cukup 99%
-    # final_input = final_input[training_column_order] # <-- Jika Anda punya daftar urutan kolom training
-    
-    # 3. Lakukan prediksi
-    with st.spinner('Memprediksi harga...'):
-        prediction = model.predict(final_input)[0]
-
-    # 4. Tampilkan hasil
+# --- Logika Prediksi ---
+if submitted:
+    # 1. Hitung fitur tambahan dari input pengguna; pilihan kategori diterjemahkan ke kode integer
+    numerics, codes = encode_inputs(brand, model_name, year, engine_size, fuel_type, transmission,
+                                    mileage, doors, owner_count, CURRENT_YEAR)
+    car_age, mileage_per_year = numerics[5], numerics[6]
+
+    # 2. Lakukan prediksi. Klik ulang dengan input yang sama (misal tidak sengaja) langsung
+    # memakai hasil terakhir sesi ini; input yang pernah diprediksi sesi lain diambil dari cache.
+    key = (numerics, codes)
+    if st.session_state.get('last_key') == key:
+        prediction = st.session_state['last_pred']
+    else:
+        # Vektor input disusun di buffer float32 milik sesi yang diisi ulang setiap prediksi
+        if 'feat_buf' not in st.session_state:
+            st.session_state['feat_buf'] = np.zeros((1, N_FEATURES), dtype=np.float32)
+        try:
+            with st.spinner('Memprediksi harga...'):
+                prediction = _predict_cached(numerics, codes, _out=st.session_state['feat_buf'])
+        except requests.RequestException as e:
+            # Hanya terjadi dengan PREDICT_SVC_URL; kegagalan tidak di-cache sehingga klik
+            # berikutnya mencoba lagi
+            st.error(f"Layanan prediksi tidak dapat dihubungi: {e}")
+            st.stop()
+        st.session_state['last_key'] = key
+        st.session_state['last_pred'] = prediction
+
+    # 3. Tampilkan hasil
     st.success(f"### Estimasi Harga Mobil: **${prediction:,.2f}**")
 
     # Tampilkan metrik fitur tambahan
@@ -165,7 +180,7 @@ with st.expander("❓ Tentang Model Prediksi Ini"):
     Model ini menggunakan algoritma **XGBoost** yang telah dilatih dengan data ribuan mobil bekas. 
     Akurasi model sangat bergantung pada kualitas data dan kesamaan fitur input dengan data saat pelatihan.
 
-    **Penting:** Aplikasi ini melakukan pra-pemrosesan data (One-Hot Encoding) pada input Anda agar formatnya sesuai dengan yang diharapkan oleh model yang telah dimuat. Pastikan daftar opsi (merek, model, dll.) di aplikasi ini cocok dengan data yang digunakan untuk melatih model Anda.
+    **Penting:** Aplikasi ini menerapkan pra-pemrosesan yang tersimpan di dalam model (standarisasi fitur numerik dan One-Hot Encoding) pada input Anda agar formatnya sesuai dengan yang diharapkan oleh model yang telah dimuat. Pastikan daftar opsi (merek, model, dll.) di aplikasi ini cocok dengan data yang digunakan untuk melatih model Anda.
     """)
 
 st.markdown(f"""
@@ -0,0 +1,69 @@
+# check_transform.py
+#
+# Pengecekan kesetaraan jalur prediksi aplikasi dengan Pipeline asli: untuk pilihan
+# UI acak, predict(transform_row(...)) pada backend booster XGBoost dan kernel Numba
+# harus sama dengan pipeline.predict(DataFrame). Jalankan setelah model dilatih ulang
+# atau setelah mengubah features.py / feature_kernel.py / tree_kernel.py:
+#
+#   python check_transform.py [--rows 3000] [--tol 0.5]
+#
+# Keluar dengan status 1 jika selisih salah satu backend melebihi toleransi.
+
+import os
+
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+import argparse
+import datetime
+import sys
+
+import numpy as np
+import pandas as pd
+
+import tree_kernel
+from features import make_row_builder, random_inputs, raw_row
+from predictor import MODEL_PATH, load_pipeline
+
+
+def _backends(regressor):
+    """Backend yang dicek: booster XGBoost (inplace_predict) dan, jika tersedia, kernel Numba."""
+    booster = tree_kernel.prediction_booster(regressor.get_booster())
+    booster.set_param({'nthread': 1})
+    backends = {'xgboost': lambda x: float(booster.inplace_predict(x, validate_features=False)[0])}
+    if tree_kernel.numba is not None and tree_kernel.is_supported(booster):
+        backends['numba'] = tree_kernel.compile_predictor(booster)
+    else:
+        print("Kernel Numba dilewati (numba tidak terpasang atau booster tidak didukung)")
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan prediksi aplikasi dengan Pipeline.predict.")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path model hasil training (joblib)")
+    parser.add_argument('--rows', type=int, default=3000, help="Jumlah pilihan UI acak")
+    parser.add_argument('--tol', type=float, default=0.5, help="Selisih absolut maksimum yang diterima")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    model = load_pipeline(args.model)
+    preprocessor, regressor, transform_row = make_row_builder(model)
+    inputs = random_inputs(np.random.default_rng(args.seed), args.rows, datetime.datetime.now().year)
+    frame = pd.DataFrame([raw_row(numerics, codes) for numerics, codes in inputs],
+                         columns=preprocessor.feature_names_in_)
+    expected = model.predict(frame)
+
+    failed = False
+    for name, predict in _backends(regressor).items():
+        actual = np.array([predict(transform_row(numerics, codes)) for numerics, codes in inputs])
+        diff = np.abs(actual - expected)
+        worst = int(diff.argmax())
+        ok = diff[worst] <= args.tol
+        failed |= not ok
+        print(f"{name:8s} selisih maksimum {diff[worst]:.4f} ({'OK' if ok else 'GAGAL'})")
+        if not ok:
+            print(f"         input terburuk: {raw_row(*inputs[worst])}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
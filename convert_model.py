@@ -0,0 +1,143 @@
+# convert_model.py
+#
+# Langkah offline (cukup dijalankan sekali setelah model dilatih ulang):
+# mengonversi model XGBoost hasil training menjadi artefak yang lebih cepat
+# untuk prediksi satu baris di aplikasi Streamlit.
+#
+#   python convert_model.py onnx [--tol 0.5]
+#   python convert_model.py treelite [--quantize] [--tol 0.5]
+#
+# Aplikasi langsung memakai artefak yang ada, jadi setiap artefak ditulis ke file
+# sementara, dibandingkan dengan booster XGBoost, dan baru menggantikan artefak lama
+# setelah lolos pengecekan.
+
+import argparse
+import datetime
+import os
+import sys
+
+import numpy as np
+
+from features import make_row_builder, random_inputs
+from predictor import MODEL_PATH, ONNX_PATH, TREELITE_PATH, load_pipeline
+from tree_kernel import booster_base_score, prediction_booster
+
+
+def _patch_base_score(regressor):
+    """Menyalin base_score dari konfigurasi booster ke parameter estimator.
+
+    Sejak XGBoost 2.x, get_xgb_params() mengembalikan None untuk base_score yang
+    diestimasi saat training. Beberapa versi onnxmltools lalu memakai nilai default
+    0.5 sehingga semua prediksi ONNX bergeser.
+    """
+    regressor.set_params(base_score=booster_base_score(regressor.get_booster()))
+
+
+def export_onnx(regressor, path=ONNX_PATH):
+    """Mengonversi estimator XGBoost ke ONNX dengan satu input float32 bernama 'input'."""
+    import onnxmltools
+    from onnxmltools.convert.common.data_types import FloatTensorType
+
+    _patch_base_score(regressor)
+    # XGBoost membandingkan split condition dalam float32, jadi input ONNX juga float32
+    n_features = regressor.get_booster().num_features()
+    onnx_model = onnxmltools.convert_xgboost(
+        regressor, initial_types=[('input', FloatTensorType([None, n_features]))]
+    )
+    onnxmltools.utils.save_model(onnx_model, path)
+
+
+def export_treelite(regressor, path=TREELITE_PATH, quantize=False):
+    """Mengompilasi model XGBoost menjadi shared library C dengan Treelite (butuh gcc).
+
+    Dengan quantize=True, ambang split disimpan sebagai indeks integer per fitur (opsi
+    `quantize` Treelite) sehingga node pohon lebih kecil dan perbandingan dilakukan
+    pada integer. Memakai API Treelite 3.x (treelite + treelite_runtime); kompilasi ke C
+    dipindahkan ke paket TL2cgen sejak Treelite 4.0.
+    """
+    import treelite
+
+    params = {'parallel_comp': 32}
+    if quantize:
+        params['quantize'] = 1
+    tl_model = treelite.Model.from_xgboost(prediction_booster(regressor.get_booster()))
+    tl_model.export_lib(toolchain='gcc', libpath=path, params=params, verbose=False)
+
+
+def _check_rows(transform_row, n_rows=2000, seed=0):
+    """Matriks float32 (n_rows, n_fitur) dari pilihan UI acak, disusun dengan transform_row
+    yang sama seperti di aplikasi (dataset training tidak disimpan di repo)."""
+    rows = random_inputs(np.random.default_rng(seed), n_rows, datetime.datetime.now().year)
+    return np.vstack([transform_row(numerics, codes) for numerics, codes in rows])
+
+
+def _compare(actual, expected, tol):
+    """Mencetak selisih absolut maksimum dan R² terhadap prediksi booster, lalu
+    mengembalikan True jika selisih maksimum tidak melebihi tol."""
+    max_diff = np.abs(actual - expected).max()
+    r2 = 1 - np.sum((actual - expected) ** 2) / np.sum((expected - expected.mean()) ** 2)
+    print(f"Selisih maksimum: {max_diff:.4f} (toleransi {tol}) | R² terhadap XGBoost: {r2:.6f}")
+    return max_diff <= tol
+
+
+def check_onnx(regressor, transform_row, path=ONNX_PATH, tol=0.5):
+    """Membandingkan prediksi model ONNX dengan booster XGBoost asli (lihat _compare)."""
+    import onnxruntime as ort
+
+    X = _check_rows(transform_row)
+    expected = prediction_booster(regressor.get_booster()).inplace_predict(X, validate_features=False)
+    sess = ort.InferenceSession(path, providers=['CPUExecutionProvider'])
+    actual = sess.run(None, {'input': X})[0].ravel()
+    return _compare(actual, expected, tol)
+
+
+def check_treelite(regressor, transform_row, path=TREELITE_PATH, tol=0.5):
+    """Membandingkan prediksi library Treelite dengan booster XGBoost asli (lihat _compare)."""
+    import treelite_runtime
+
+    X = _check_rows(transform_row)
+    expected = prediction_booster(regressor.get_booster()).inplace_predict(X, validate_features=False)
+    predictor = treelite_runtime.Predictor(os.path.abspath(path), nthread=1)
+    actual = predictor.predict(treelite_runtime.DMatrix(X)).ravel()
+    return _compare(actual, expected, tol)
+
+
+def _export_checked(export, check, path):
+    """Menjalankan export(tmp_path) lalu check(tmp_path); artefak di path hanya diganti jika
+    pengecekan lolos. Jika gagal, artefak lama dibiarkan dan proses keluar dengan status 1."""
+    # Ekstensi dipertahankan (treelite_runtime hanya menerima .so/.dll/.dylib)
+    root, ext = os.path.splitext(path)
+    tmp_path = f'{root}.tmp{ext}'
+    try:
+        export(tmp_path)
+        if not check(tmp_path):
+            sys.exit(f"Artefak tidak lolos pengecekan; '{path}' tidak diubah")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"Artefak disimpan ke '{path}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Konversi model XGBoost untuk inferensi cepat.")
+    parser.add_argument('target', choices=['onnx', 'treelite'], help="Format artefak yang dihasilkan")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path model hasil training (joblib)")
+    parser.add_argument('--quantize', action='store_true',
+                        help="Treelite: simpan ambang split sebagai indeks integer")
+    parser.add_argument('--tol', type=float, default=0.5,
+                        help="Selisih absolut maksimum artefak terhadap XGBoost yang diterima")
+    args = parser.parse_args()
+
+    _, regressor, transform_row = make_row_builder(load_pipeline(args.model))
+    if args.target == 'onnx':
+        _export_checked(lambda path: export_onnx(regressor, path),
+                        lambda path: check_onnx(regressor, transform_row, path, tol=args.tol),
+                        ONNX_PATH)
+    elif args.target == 'treelite':
+        _export_checked(lambda path: export_treelite(regressor, path, quantize=args.quantize),
+                        lambda path: check_treelite(regressor, transform_row, path, tol=args.tol),
+                        TREELITE_PATH)
+
+if __name__ == '__main__':
+    main()
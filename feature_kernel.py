@@ -0,0 +1,46 @@
+# feature_kernel.py
+#
+# Kernel penyusun satu baris input model: fitur numerik distandarkan dan slot one-hot
+# diisi berdasarkan kode integer setiap kategori, tanpa lookup string per klik.
+# Berada di modul tersendiri agar Numba hanya mengompilasinya sekali per proses,
+# bukan pada setiap rerun skrip Streamlit.
+
+try:
+    import numba
+except ImportError:  # Numba opsional; tanpa itu kernel berjalan sebagai Python biasa
+    numba = None
+
+
+def _set_onehot(row, cat_table, j, code):
+    pos = cat_table[j, code]
+    if pos >= 0:  # -1: kategori tidak dikenal model, dibiarkan 0 (handle_unknown='ignore')
+        row[pos] = 1
+
+
+def fill_row(out, num_idx, num_mean, num_scale, cat_table,
+             year, engine_size, mileage, doors, owner_count, car_age, mileage_per_year,
+             brand, model, fuel_type, transmission, brand_model):
+    """Mengisi ulang buffer out (1, n_fitur) untuk satu baris input.
+
+    num_idx/num_mean/num_scale memberi posisi serta parameter standarisasi ketujuh fitur
+    numerik; cat_table[j, kode] memberi posisi kolom one-hot kategori ke-j (atau -1).
+    """
+    row = out[0]
+    row[:] = 0
+    row[num_idx[0]] = (year - num_mean[0]) / num_scale[0]
+    row[num_idx[1]] = (engine_size - num_mean[1]) / num_scale[1]
+    row[num_idx[2]] = (mileage - num_mean[2]) / num_scale[2]
+    row[num_idx[3]] = (doors - num_mean[3]) / num_scale[3]
+    row[num_idx[4]] = (owner_count - num_mean[4]) / num_scale[4]
+    row[num_idx[5]] = (car_age - num_mean[5]) / num_scale[5]
+    row[num_idx[6]] = (mileage_per_year - num_mean[6]) / num_scale[6]
+    _set_onehot(row, cat_table, 0, brand)
+    _set_onehot(row, cat_table, 1, model)
+    _set_onehot(row, cat_table, 2, fuel_type)
+    _set_onehot(row, cat_table, 3, transmission)
+    _set_onehot(row, cat_table, 4, brand_model)
+
+
+if numba is not None:
+    _set_onehot = numba.njit(cache=True, nogil=True)(_set_onehot)
+    fill_row = numba.njit(cache=True, nogil=True)(fill_row)
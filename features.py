@@ -0,0 +1,192 @@
+# features.py
+#
+# Skema input model dan penyusun vektor input satu baris. Dipakai bersama oleh aplikasi
+# Streamlit (app.py), pengecekan kesetaraan preprocessing (check_transform.py), dan
+# pengecekan artefak hasil konversi (convert_model.py), sehingga ketiganya menyusun
+# vektor input dengan cara yang sama.
+
+import numpy as np
+import sklearn
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from feature_kernel import fill_row
+
+# --- Data untuk Dropdown UI ---
+# PENTING: Daftar ini harus sama persis dengan kategori yang digunakan saat melatih model
+brands = ['Audi', 'BMW', 'Chevrolet', 'Ford', 'Honda', 'Hyundai', 'Kia',
+          'Mercedes', 'Toyota', 'Volkswagen']
+models_dict = {
+    'Audi': ['A3', 'A4', 'Q5'], 'BMW': ['3 Series', '5 Series', 'X5'], 'Chevrolet': ['Equinox', 'Impala', 'Malibu'],
+    'Ford': ['Explorer', 'Fiesta', 'Focus'], 'Honda': ['Accord', 'CR-V', 'Civic'], 'Hyundai': ['Elantra', 'Sonata', 'Tucson'],
+    'Kia': ['Optima', 'Rio', 'Sportage'], 'Mercedes': ['C-Class', 'E-Class', 'GLA'], 'Toyota': ['Camry', 'Corolla', 'RAV4'],
+    'Volkswagen': ['Golf', 'Passat', 'Tiguan']
+}
+fuel_types = ['Petrol', 'Diesel', 'Hybrid', 'Electric']
+transmissions = ['Automatic', 'Manual', 'Semi-Automatic']
+doors_options = [2, 3, 4, 5]
+
+# --- Skema Fitur Model ---
+# Definisikan fitur kategorikal dan numerik (harus sama dengan saat training)
+categorical_features = ['Brand', 'Model', 'Fuel_Type', 'Transmission', 'Brand_Model']
+numerical_features = ['Year', 'Engine_Size', 'Mileage', 'Doors', 'Owner_Count', 'Car_Age', 'Mileage_per_Year']
+
+# Opsi setiap fitur kategorikal (urutan sama dengan categorical_features) dan kode integernya.
+# Input dari UI diterjemahkan ke kode ini sekali per klik; kernel pengisi vektor hanya
+# bekerja dengan integer.
+CATEGORY_VALUES = (
+    brands,
+    list(dict.fromkeys(m for ms in models_dict.values() for m in ms)),
+    fuel_types,
+    transmissions,
+    [f"{b}_{m}" for b in brands for m in models_dict[b]],
+)
+CATEGORY_CODES = tuple({value: code for code, value in enumerate(values)} for values in CATEGORY_VALUES)
+
+
+def encode_inputs(brand, model_name, year, engine_size, fuel_type, transmission, mileage, doors,
+                  owner_count, current_year):
+    """Menerjemahkan pilihan UI menjadi (numerics, codes): nilai fitur numerik (urutan sama
+    dengan numerical_features, termasuk fitur turunan) dan kode kategori (lihat CATEGORY_CODES)."""
+    car_age = current_year - year
+    mileage_per_year = mileage / car_age if car_age > 0 else 0
+    brand_model = f"{brand}_{model_name}"
+    codes = tuple(CATEGORY_CODES[j][value]
+                  for j, value in enumerate((brand, model_name, fuel_type, transmission, brand_model)))
+    numerics = (year, engine_size, mileage, doors, owner_count, car_age, mileage_per_year)
+    return numerics, codes
+
+
+def random_inputs(rng, n_rows, current_year):
+    """Membangkitkan n_rows pilihan UI acak (dalam rentang widget app.py) sebagai daftar
+    (numerics, codes), untuk pengecekan kesetaraan prediksi."""
+    rows = []
+    for _ in range(n_rows):
+        brand = brands[rng.integers(len(brands))]
+        rows.append(encode_inputs(
+            brand=brand,
+            model_name=models_dict[brand][rng.integers(len(models_dict[brand]))],
+            year=int(rng.integers(2000, current_year + 1)),
+            engine_size=round(float(rng.integers(10, 51)) / 10, 1),
+            fuel_type=fuel_types[rng.integers(len(fuel_types))],
+            transmission=transmissions[rng.integers(len(transmissions))],
+            mileage=int(rng.integers(0, 301)) * 1000,
+            doors=doors_options[rng.integers(len(doors_options))],
+            owner_count=int(rng.integers(1, 6)),
+            current_year=current_year,
+        ))
+    return rows
+
+
+def raw_row(numerics, codes):
+    """Mengembalikan dict kolom -> nilai mentah (seperti DataFrame saat training) untuk satu baris."""
+    row = dict(zip(numerical_features, numerics))
+    for feature, values, code in zip(categorical_features, CATEGORY_VALUES, codes):
+        row[feature] = values[code]
+    return row
+
+
+def pipeline_schema(preprocessor):
+    """Membaca layout output ColumnTransformer yang sudah di-fit: peta kolom -> posisi,
+    serta mean dan scale StandardScaler untuk setiap posisi (0 dan 1 untuk kolom one-hot).
+
+    Melempar ValueError untuk preprocessor yang tidak bisa diturunkan ke NumPy, sehingga
+    pemanggil bisa memakai make_pipeline_transform sebagai gantinya.
+    """
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError(f"Preprocessor {type(preprocessor).__name__} tidak didukung")
+    n_features = max(s.stop for s in preprocessor.output_indices_.values())
+    col_index = {}
+    # Sengaja float64: StandardScaler menghitung (x - mean) / scale dalam float64 saat training,
+    # dan melakukannya dalam float32 menggeser sebagian nilai melewati ambang split XGBoost.
+    mean = np.zeros(n_features)
+    scale = np.ones(n_features)
+    for name, transformer, columns in preprocessor.transformers_:
+        start = preprocessor.output_indices_[name].start
+        if transformer == 'drop':
+            continue
+        if isinstance(transformer, StandardScaler):
+            for j, col in enumerate(columns):
+                col_index[col] = start + j
+            end = start + len(columns)
+            if transformer.with_mean:
+                mean[start:end] = transformer.mean_
+            if transformer.with_std:
+                scale[start:end] = transformer.scale_
+        elif isinstance(transformer, OneHotEncoder) and transformer.drop_idx_ is None:
+            # Kategori jarang yang digabung menjadi satu kolom 'infrequent' tidak lagi
+            # satu kolom per kategori
+            if transformer.min_frequency is not None or transformer.max_categories is not None:
+                raise ValueError(f"OneHotEncoder '{name}' dengan kategori infrequent tidak didukung")
+            for col, categories in zip(columns, transformer.categories_):
+                for category in categories:
+                    col_index[f'{col}_{category}'] = start
+                    start += 1
+        else:
+            raise ValueError(f"Transformer '{name}' ({type(transformer).__name__}) pada Pipeline tidak didukung")
+    missing = [col for col in numerical_features if col not in col_index]
+    if missing:
+        raise ValueError(f"Fitur numerik {missing} tidak distandarkan oleh StandardScaler pada Pipeline")
+    return col_index, mean, scale
+
+
+def make_transform_row(col_index, mean, scale):
+    """Membuat fungsi yang menyusun satu baris input float32 (1, n_fitur) dari nilai numerik
+    dan kode kategori (lihat CATEGORY_CODES), setara dengan preprocessing model namun tanpa
+    DataFrame. Jika diberikan, buffer `out` diisi ulang dan dikembalikan."""
+    n_features = len(mean)
+    num_idx = np.array([col_index[col] for col in numerical_features], dtype=np.int64)
+    num_mean = mean[num_idx]
+    num_scale = scale[num_idx]
+    # cat_table[j, kode] = posisi kolom one-hot untuk opsi tersebut, -1 jika tidak dikenal model
+    cat_table = np.full((len(categorical_features), max(map(len, CATEGORY_VALUES))), -1, dtype=np.int64)
+    for j, (feature, values) in enumerate(zip(categorical_features, CATEGORY_VALUES)):
+        for code, value in enumerate(values):
+            cat_table[j, code] = col_index.get(f'{feature}_{value}', -1)
+
+    def transform_row(numerics, codes, out=None):
+        # Buffer `out` dari pemanggilan sebelumnya dipakai ulang agar tidak ada alokasi per klik
+        if out is None or out.shape != (1, n_features):
+            out = np.zeros((1, n_features), dtype=np.float32)
+        # Semua nilai numerik dijadikan float agar kernel Numba cukup dikompilasi untuk satu signature.
+        # Hasil standarisasi langsung ditulis ke buffer float32 (tipe input XGBoost).
+        fill_row(out, num_idx, num_mean, num_scale, cat_table, *map(float, numerics), *codes)
+        return out
+
+    return transform_row
+
+
+def make_pipeline_transform(preprocessor):
+    """Cadangan untuk preprocessor yang tidak bisa diturunkan ke NumPy: menjalankan
+    transform() milik preprocessor itu sendiri, lalu hasilnya langsung diberikan ke booster
+    tanpa melewati Pipeline.predict dan validasi estimator terakhirnya."""
+    import pandas as pd
+
+    def transform_row(numerics, codes, out=None):
+        row = raw_row(numerics, codes)
+        input_data = pd.DataFrame({col: [row[col]] for col in preprocessor.feature_names_in_})
+        # Input dari UI selalu terisi, jadi pengecekan NaN/inf scikit-learn bisa dilewati
+        with sklearn.config_context(assume_finite=True):
+            x = preprocessor.transform(input_data)
+        if hasattr(x, 'toarray'):
+            x = x.toarray()
+        if out is not None and out.shape == x.shape:
+            out[...] = x
+            return out
+        return np.ascontiguousarray(x, dtype=np.float32)
+
+    return transform_row
+
+
+def make_row_builder(model):
+    """Mengembalikan (preprocessor, regressor, transform_row) dari Pipeline model.
+    transform_row memakai jalur NumPy jika preprocessor bisa diturunkan, atau transform()
+    preprocessor itu sendiri jika tidak."""
+    # Semua langkah sebelum estimator XGBoost adalah preprocessing
+    preprocessor = model.steps[0][1] if len(model.steps) == 2 else model[:-1]
+    regressor = model.steps[-1][1]
+    try:
+        transform_row = make_transform_row(*pipeline_schema(preprocessor))
+    except ValueError:
+        transform_row = make_pipeline_transform(preprocessor)
+    return preprocessor, regressor, transform_row
@@ -0,0 +1,38 @@
+# predict_svc.py
+#
+# Layanan prediksi terpisah dari proses Streamlit: model dimuat sekali per worker dan
+# tetap hidup di antara permintaan, tidak terpengaruh rerun skrip Streamlit.
+#
+#   OMP_NUM_THREADS=1 uvicorn --workers 4 predict_svc:app
+#   PREDICT_SVC_URL=http://localhost:8000 streamlit run app.py
+
+import os
+
+# Banyak worker x satu thread: setiap permintaan hanya satu baris
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from predictor import MODEL_PATH, load_predictor, load_regressor
+
+regressor = load_regressor(os.environ.get('MODEL_PATH', MODEL_PATH))
+N_FEATURES = regressor.get_booster().num_features()
+predict = load_predictor(regressor)
+predict(np.zeros((1, N_FEATURES), dtype=np.float32))  # Pemanasan sebelum permintaan pertama
+
+app = FastAPI(title="Prediksi Harga Mobil")
+
+
+class PredictRequest(BaseModel):
+    # Vektor input model yang sudah diproses (hasil make_transform_row di features.py)
+    features: list[float]
+
+
+@app.post('/predict')
+def predict_price(request: PredictRequest):
+    if len(request.features) != N_FEATURES:
+        raise HTTPException(status_code=422, detail=f"features harus berisi {N_FEATURES} nilai")
+    x = np.asarray(request.features, dtype=np.float32).reshape(1, -1)
+    return {'prediction': predict(x)}
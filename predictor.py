@@ -0,0 +1,114 @@
+# predictor.py
+#
+# Backend prediksi satu baris untuk estimator XGBoost, dipakai bersama oleh aplikasi
+# Streamlit (app.py) dan layanan prediksi (predict_svc.py). Pemanggil sebaiknya
+# men-set OMP_NUM_THREADS=1 sebelum mengimpor modul ini.
+
+import os
+import warnings
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+try:
+    import onnxruntime as ort
+except ImportError:  # ONNX Runtime opsional; tanpa itu model XGBoost dipakai langsung
+    ort = None
+
+try:
+    import treelite_runtime
+except ImportError:  # Treelite opsional; dipakai hanya jika library hasil kompilasi tersedia
+    treelite_runtime = None
+
+import tree_kernel
+
+MODEL_PATH = 'car_price_xgboost_model.pkl'
+ONNX_PATH = 'car_price.onnx'  # Dihasilkan oleh: python convert_model.py onnx
+TREELITE_PATH = 'car_price.so'  # Dihasilkan oleh: python convert_model.py treelite
+
+# Selisih maksimum (dalam satuan harga) antara artefak hasil konversi dan booster XGBoost
+# agar artefak itu dipakai; selisih float32 normal jauh di bawah ini.
+ARTIFACT_TOL = 0.5
+
+
+def load_pipeline(path=MODEL_PATH):
+    """Memuat Pipeline scikit-learn (preprocessing + estimator XGBoost) dari file joblib."""
+    # File model disimpan dengan joblib, sehingga pickle.load biasa tidak bisa membacanya
+    model = joblib.load(path)
+    if not hasattr(model, 'steps'):
+        raise ValueError(f"Model '{path}' harus berupa Pipeline scikit-learn dengan estimator XGBoost di langkah terakhir")
+    return model
+
+
+def load_regressor(path=MODEL_PATH):
+    """Memuat Pipeline dari file joblib dan mengembalikan estimator XGBoost-nya."""
+    return load_pipeline(path).steps[-1][1]
+
+
+def _matches_booster(name, predict, rows, expected, tol=ARTIFACT_TOL):
+    """True jika predict memberi hasil yang sama dengan booster untuk setiap baris.
+    Artefak hasil konversi tidak terikat ke file .pkl, sehingga artefak lama yang tidak
+    di-generate ulang setelah training ulang tetap termuat tanpa error."""
+    try:
+        actual = [predict(row) for row in rows]
+    except Exception as e:  # misal lebar input artefak berbeda dengan model
+        warnings.warn(f"Artefak {name} dilewati: {e}")
+        return False
+    max_diff = max(abs(a - b) for a, b in zip(actual, expected))
+    if max_diff > tol:
+        warnings.warn(f"Artefak {name} dilewati: selisih {max_diff:.4f} terhadap model XGBoost "
+                      f"(artefak lama? jalankan ulang convert_model.py)")
+        return False
+    return True
+
+
+def load_predictor(regressor, treelite_path=TREELITE_PATH, onnx_path=ONNX_PATH, check_x=None):
+    """Memilih backend prediksi: library Treelite hasil kompilasi, lalu ONNX Runtime, lalu
+    kernel Numba dari pohon-pohon booster, lalu booster XGBoost. Mengembalikan fungsi
+    predict(x) untuk satu baris float32 (1, n_fitur).
+
+    Semua backend hanya berisi estimator XGBoost, tanpa preprocessing Pipeline: x harus sudah
+    distandarkan dan di-one-hot dengan urutan kolom output ColumnTransformer (lihat
+    make_transform_row di features.py). Vektor dengan lebar sama tetapi layout lain tetap diterima
+    tanpa error, hanya saja harganya salah.
+
+    Artefak Treelite/ONNX hanya dipakai jika prediksinya untuk baris check_x (float32
+    (n, n_fitur); default beberapa baris acak) sama dengan booster dalam ARTIFACT_TOL;
+    jika tidak, backend berikutnya dicoba dengan peringatan.
+    """
+    regressor.set_params(n_jobs=1)
+    booster = tree_kernel.prediction_booster(regressor.get_booster())
+    booster.set_param({'nthread': 1})
+    if regressor.booster == 'gblinear':
+        # inplace_predict hanya didukung booster pohon; gblinear tetap lewat DMatrix
+        booster_predict = lambda x: float(booster.predict(xgb.DMatrix(x), validate_features=False)[0])
+    else:
+        # inplace_predict membaca array float32 langsung tanpa membangun DMatrix, dan
+        # validate_features=False melewati pengecekan nama kolom per panggilan
+        booster_predict = lambda x: float(booster.inplace_predict(x, validate_features=False)[0])
+
+    if check_x is None:
+        check_x = np.random.default_rng(0).standard_normal((8, booster.num_features())).astype(np.float32)
+    rows = [check_x[i:i + 1] for i in range(len(check_x))]
+    expected = [booster_predict(row) for row in rows]
+
+    if treelite_runtime is not None and os.path.exists(treelite_path):
+        predictor = treelite_runtime.Predictor(os.path.abspath(treelite_path), nthread=1)
+        predict = lambda x: float(predictor.predict(treelite_runtime.DMatrix(x)).item())
+        if _matches_booster(treelite_path, predict, rows, expected):
+            return predict
+
+    if ort is not None and os.path.exists(onnx_path):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = 1
+        sess = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        predict = lambda x: float(sess.run(None, {'input': x})[0][0][0])
+        if _matches_booster(onnx_path, predict, rows, expected):
+            return predict
+
+    if tree_kernel.numba is not None and tree_kernel.is_supported(booster):
+        # Pohon-pohon booster dikompilasi sekali jadi kernel Numba; XGBoost tidak lagi dipanggil per klik
+        return tree_kernel.compile_predictor(booster)
+
+    return booster_predict
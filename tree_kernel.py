@@ -0,0 +1,127 @@
+# tree_kernel.py
+#
+# Prediksi XGBoost tanpa library XGBoost di jalur prediksi: dump JSON pohon-pohon
+# booster diratakan menjadi array node float32/int32, lalu satu kernel Numba
+# menelusuri semua pohon untuk satu baris input.
+
+import json
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Numba opsional; tanpa itu aplikasi memakai booster XGBoost langsung
+    numba = None
+
+# Objective dengan link identitas: prediksi = base_score + jumlah nilai daun
+_IDENTITY_OBJECTIVES = {'reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror'}
+
+
+def booster_base_score(booster):
+    """Membaca base_score dari konfigurasi booster.
+
+    Sejak XGBoost 2.x, base_score diestimasi dari data saat training dan disimpan sebagai
+    string di konfigurasi booster (misal '8.8E3', atau '[8.8E3]' sejak 3.x).
+    """
+    config = json.loads(booster.save_config())
+    base_score = config['learner']['learner_model_param']['base_score']
+    return float(base_score.strip('[]'))
+
+
+def prediction_booster(booster):
+    """Booster yang dipakai XGBRegressor.predict: jika model dilatih dengan early stopping,
+    hanya iterasi sampai best_iteration (lihat XGBModel._get_iteration_range); selain itu
+    booster itu sendiri. Semua backend prediksi dibangun dari booster ini agar tidak memakai
+    pohon-pohon setelah best_iteration."""
+    best_iteration = booster.attr('best_iteration')
+    if best_iteration is None:
+        return booster
+    # Slicing per iterasi hanya didukung booster pohon (gbtree/dart)
+    if json.loads(booster.save_config())['learner']['gradient_booster']['name'] == 'gblinear':
+        return booster
+    return booster[:int(best_iteration) + 1]
+
+
+def is_supported(booster):
+    """True jika booster bisa dijalankan oleh kernel ini: pohon gbtree biasa (bukan dart yang
+    memberi bobot per pohon, bukan gblinear), tanpa split kategorikal, satu target, dan
+    objective regresi identitas."""
+    learner = json.loads(booster.save_config())['learner']
+    if learner['gradient_booster']['name'] != 'gbtree':
+        return False
+    # Split kategorikal hanya mungkin pada fitur bertipe 'c' (enable_categorical=True)
+    if 'c' in (booster.feature_types or []):
+        return False
+    n_targets = int(learner['learner_model_param'].get('num_target', '1'))
+    return learner['objective']['name'] in _IDENTITY_OBJECTIVES and n_targets <= 1
+
+
+def flatten_booster(booster):
+    """Meratakan semua pohon booster menjadi array node.
+
+    Untuk node split, `feature` berisi indeks fitur dan `value` ambang split; untuk daun,
+    `feature` bernilai -1 dan `value` berisi nilai daun. `yes`, `no`, dan `missing`
+    menunjuk indeks node anak, dan `roots` indeks akar setiap pohon.
+    """
+    names = booster.feature_names
+    feature, value, yes, no, missing, roots = [], [], [], [], [], []
+
+    def add(node):
+        i = len(feature)
+        feature.append(-1)
+        value.append(0.0)
+        yes.append(-1)
+        no.append(-1)
+        missing.append(-1)
+        if 'leaf' in node:
+            value[i] = node['leaf']
+            return i
+        if 'categories' in node:  # Kernel hanya membandingkan ambang numerik
+            raise ValueError(f"Split kategorikal pada node {node['nodeid']} tidak didukung")
+        children = {child['nodeid']: child for child in node['children']}
+        split = node['split']
+        feature[i] = names.index(split) if names else int(split[1:])  # tanpa nama: 'f12'
+        value[i] = node['split_condition']
+        yes[i] = add(children[node['yes']])
+        no[i] = add(children[node['no']])
+        missing[i] = yes[i] if node['missing'] == node['yes'] else no[i]
+        return i
+
+    for tree in booster.get_dump(dump_format='json'):
+        roots.append(add(json.loads(tree)))
+
+    return (np.array(feature, dtype=np.int32), np.array(value, dtype=np.float32),
+            np.array(yes, dtype=np.int32), np.array(no, dtype=np.int32),
+            np.array(missing, dtype=np.int32), np.array(roots, dtype=np.int32))
+
+
+def _walk(x, feature, value, yes, no, missing, roots, base_score):
+    """Menjumlahkan nilai daun dari semua pohon untuk satu baris x (float32)."""
+    total = 0.0
+    for root in roots:
+        i = root
+        while feature[i] >= 0:
+            v = x[feature[i]]
+            if v < value[i]:
+                i = yes[i]
+            elif v >= value[i]:
+                i = no[i]
+            else:  # NaN
+                i = missing[i]
+        total += value[i]
+    return base_score + total
+
+
+if numba is not None:
+    _walk = numba.njit(cache=True, nogil=True)(_walk)
+
+
+def compile_predictor(booster):
+    """Mengompilasi booster (lihat is_supported) menjadi fungsi predict(x) untuk satu baris
+    float32 (1, n_fitur). Kernel dikompilasi saat fungsi ini dipanggil, bukan saat klik pertama."""
+    if numba is None:
+        raise ImportError("compile_predictor membutuhkan paket numba")
+    arrays = flatten_booster(booster)
+    base_score = booster_base_score(booster)
+    _walk(np.zeros(booster.num_features(), dtype=np.float32), *arrays, base_score)
+    return lambda x: float(_walk(x[0], *arrays, base_score))